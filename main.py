@@ -1,37 +1,97 @@
 
+import argparse
+import atexit
 import logging
-from src.database import init_database, generate_stats_report, generate_playoffs_report
-from src.regular_season import generate_nba_schedule, simulate_conferences
-from src.playoffs import simulate_playoffs
+import multiprocessing
+import random
+from logging.handlers import MemoryHandler, QueueHandler, QueueListener
 
 
 # Configure logging
+# Threads and conference processes only enqueue records; a single listener
+# thread does the file and console writes. File records are buffered and
+# written in batches; errors flush the buffer straight away
+log_queue = multiprocessing.Queue(-1)
+file_handler = MemoryHandler(
+    capacity=10000,
+    flushLevel=logging.ERROR,
+    target=logging.FileHandler("nba_simulation.log")
+)
+log_listener = QueueListener(
+    log_queue,
+    file_handler,
+    logging.StreamHandler()
+)
+log_listener.start()
+# atexit runs in reverse order: drain the queue first, then flush what's buffered
+atexit.register(file_handler.close)
+atexit.register(log_listener.stop)
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(threadName)s - %(message)s',
-    handlers=[
-        logging.FileHandler("nba_simulation.log"),
-        logging.StreamHandler()
-    ]
+    handlers=[QueueHandler(log_queue)]
 )
 
 
-def main():
+def positive_int(value):
+    """argparse type for options that must be a whole number above zero"""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def parse_args():
+    """Parse command line options for a simulation run"""
+    parser = argparse.ArgumentParser(description="Simulate an NBA regular season and playoffs")
+    parser.add_argument('--games', type=positive_int, default=10, help="regular season games per team (default: 10)")
+    parser.add_argument('--realtime', action='store_true', help="pace games and stadium operations in real time")
+    parser.add_argument('--verbose', action='store_true', help="log every play-by-play event")
+    parser.add_argument('--seed', type=int, help="seed for a reproducible run (start from a fresh database)")
+    return parser.parse_args()
+
+
+def main(num_games=10, realtime=False, seed=None):
     """Main function to run the NBA season simulation"""
+    # Imported here so the team/player data files are only parsed when a simulation actually runs
+    from src.database import init_database, close_database, get_last_game_id, create_report_indexes, generate_stats_report, generate_playoffs_report
+    from src.regular_season import generate_nba_schedule, simulate_conferences
+    from src.playoffs import simulate_playoffs
+    from src.globals import SimulationContext
+
     init_database()
+    context = SimulationContext(realtime=realtime)
+
+    # Separate seeds for the schedule, the season and the playoffs, all derived from the run's seed
+    seeds = random.Random(seed)
+    schedule_seed, season_seed, playoffs_seed = (seeds.getrandbits(64) for _ in range(3))
 
     # regular season
     logging.info("Starting NBA regular season simulation")
-    eastern_games, western_games = generate_nba_schedule(num_games=10)
+    # Number this run's games after the ones earlier runs already saved
+    first_game_id = get_last_game_id() + 1
+    eastern_games, western_games = generate_nba_schedule(num_games=num_games, seed=schedule_seed, first_game_id=first_game_id)
     
-    simulate_conferences(eastern_games, western_games)
+    simulate_conferences(eastern_games, western_games, context, seed=season_seed)
+    create_report_indexes()
     generate_stats_report()
     
-    logging.info("\n" + "=" * 60)
+    logging.info("\n%s", "=" * 60)
     logging.info("Starting NBA Playoffs Simulation")
     
-    all_results = simulate_playoffs()
+    all_results = simulate_playoffs(context, seed=playoffs_seed)
     generate_playoffs_report()
 
+    # Leave every row in nba_simulation.db itself rather than in its WAL file
+    close_database()
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    args = parse_args()
+    if args.verbose:
+        # Play-by-play events are logged at debug level
+        logging.getLogger().setLevel(logging.DEBUG)
+    main(num_games=args.games, realtime=args.realtime, seed=args.seed)
\ No newline at end of file
@@ -1,15 +1,179 @@
 import sqlite3
 import logging
+import threading
+import queue
 from datetime import datetime
 import os
 
+DB_PATH = 'nba_simulation.db'
+
+# Fallback date for games saved without one, formatted once per run
+TODAY = datetime.now().strftime('%Y-%m-%d')
+
+# Insert statements are kept as constants so every batch reuses sqlite3's cached prepared statement
+INSERT_GAME_SQL = "INSERT OR REPLACE INTO games VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+INSERT_PLAYER_STATS_SQL = "INSERT INTO player_stats (game_id, player_name, team, points, two_pt, three_pt, free_throws, turnovers, rebounds, assists, steals, blocks) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+INSERT_PLAYOFFS_GAME_SQL = "INSERT OR REPLACE INTO playoffs_games VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+INSERT_PLAYOFFS_PLAYER_STATS_SQL = "INSERT INTO playoffs_player_stats (game_id, player_name, team, points, two_pt, three_pt, free_throws, turnovers, rebounds, assists, steals, blocks) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+INSERT_STADIUM_OPS_SQL = "INSERT INTO stadium_ops (game_id, arena, operation_type, processed_count, details) VALUES (?, ?, ?, ?, ?)"
+
+def _open_conn():
+    """Open a connection to the simulation database with faster write pragmas"""
+    # Each connection is only used by the thread that opened it; close_database() closes them all from the main thread
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+    # WAL (set in init_database) only needs an fsync at checkpoints with synchronous=NORMAL
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    # 64 MB page cache (negative values are KiB)
+    conn.execute("PRAGMA cache_size=-65536")
+    return conn
+
+# One connection per thread, reused across saves instead of connecting per call
+_local = threading.local()
+# Every thread's connection, so close_database() can close them once the run is over
+_connections = []
+
+def get_conn():
+    """Return this thread's database connection, opening it on first use"""
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        conn = _local.conn = _open_conn()
+        _connections.append(conn)
+    return conn
+
+# Game and stadium saves are queued and committed by a single writer thread per process
+WRITE_BATCH_SIZE = 500
+_write_queue = queue.Queue(maxsize=1000)
+_writer = None
+_writer_lock = threading.Lock()
+# First error the writer hit since the last flush, re-raised to the caller by flush_writes()
+_write_error = None
+
+def _commit_writes(conn, writes):
+    """Run (sql, rows) writes in one transaction, one executemany per statement"""
+    grouped = {}
+    for sql, rows in writes:
+        grouped.setdefault(sql, []).extend(rows)
+
+    with conn:
+        for sql, rows in grouped.items():
+            conn.executemany(sql, rows)
+
+def _record_write_error(error):
+    """Log a failed write and keep the first one for flush_writes() to raise"""
+    global _write_error
+    logging.error(f"Database error in writer thread: {error}")
+    if _write_error is None:
+        _write_error = error
+
+def _drain_writes():
+    """Commit queued (sql, rows) writes in batches, one executemany per statement"""
+    conn = None
+    while True:
+        batch = [_write_queue.get()]
+        if batch[0] is None:
+            # Sentinel from close_database(): everything before it has been committed
+            if conn is not None:
+                conn.close()
+            _write_queue.task_done()
+            return
+
+        while len(batch) < WRITE_BATCH_SIZE:
+            try:
+                batch.append(_write_queue.get_nowait())
+            except queue.Empty:
+                break
+
+        try:
+            if conn is None:
+                conn = _open_conn()
+            _commit_writes(conn, batch)
+        except Exception as e:
+            if conn is None:
+                _record_write_error(e)
+            else:
+                # Retry each queued save on its own so a bad row only loses the save it came in with
+                for write in batch:
+                    try:
+                        _commit_writes(conn, [write])
+                    except Exception as write_error:
+                        _record_write_error(write_error)
+        finally:
+            for _ in batch:
+                _write_queue.task_done()
+
+def _queue_write(sql, rows):
+    """Hand rows to the writer thread, starting it on first use"""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = threading.Thread(target=_drain_writes, name="DBWriter", daemon=True)
+            _writer.start()
+    _write_queue.put((sql, rows))
+
+def flush_writes():
+    """Block until every queued write has been committed, raising the first error the writer hit"""
+    global _write_error
+    _write_queue.join()
+    if _write_error is not None:
+        error, _write_error = _write_error, None
+        raise error
+
+def close_database():
+    """Commit queued writes, close every connection and put the database file back in rollback-journal mode"""
+    global _writer, _connections, _local
+    flush_writes()
+
+    # Stop the writer thread, which closes its own connection
+    with _writer_lock:
+        writer, _writer = _writer, None
+    if writer is not None:
+        _write_queue.put(None)
+        writer.join()
+
+    connections, _connections = _connections, []
+    for conn in connections:
+        conn.close()
+    # Threads that touch the database again get a fresh connection
+    _local = threading.local()
+
+    # With no connections left, the checkpoint copies every committed page into the .db file and empties the WAL
+    try:
+        conn = sqlite3.connect(DB_PATH)
+        try:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            # WAL mode is stored in the file; switching back means the saved database never needs -wal/-shm files next to it
+            conn.execute("PRAGMA journal_mode=DELETE")
+        finally:
+            conn.close()
+
+    except sqlite3.Error as e:
+        logging.error(f"Database error while checkpointing: {e}")
+        raise
+
+def _reset_connections():
+    """Drop connections and the writer thread inherited from the parent process after a fork"""
+    global _local, _connections, _write_queue, _writer, _writer_lock, _write_error
+    _local = threading.local()
+    _connections = []
+    _write_queue = queue.Queue(maxsize=1000)
+    _writer = None
+    _writer_lock = threading.Lock()
+    _write_error = None
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_connections)
+
 # Database functions
 def init_database():
     """Initialize SQLite db and create tables (game, player, stadium operations)"""
     try:
-        conn = sqlite3.connect('nba_simulation.db')
+        conn = _open_conn()
         cursor = conn.cursor()
 
+        # WAL lets readers run alongside the writer during a run; close_database() switches the file back afterwards
+        cursor.execute("PRAGMA journal_mode=WAL")
+
         # games table
         cursor.execute('''
         CREATE TABLE IF NOT EXISTS games (
@@ -119,89 +283,75 @@ def init_database():
         raise
 
 def save_game_to_db(game_id, result):
-    """Save game results to database"""
+    """Queue game results for the database writer"""
     try:
-        with sqlite3.connect('nba_simulation.db') as conn:
-            cursor = conn.cursor()
-            
-            conn.execute('BEGIN')
-
-            # Insert game result
-            cursor.execute(
-                "INSERT OR REPLACE INTO games VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-                (str(game_id), str(result['team1']), str(result['team2']), 
-                int(result['score1']), int(result['score2']), str(result['winner']),
-                str(result.get('arena', 'Unknown Arena')), 
-                str(result.get('date', datetime.now().strftime('%Y-%m-%d'))))
+        # Insert game result
+        _queue_write(
+            INSERT_GAME_SQL,
+            [(str(game_id), str(result['team1']), str(result['team2']), 
+            int(result['score1']), int(result['score2']), str(result['winner']),
+            str(result.get('arena', 'Unknown Arena')), 
+            str(result.get('date', TODAY)))]
+        )
+        
+        # insert player stats in one batch
+        if 'player_stats' in result:
+            _queue_write(
+                INSERT_PLAYER_STATS_SQL,
+                [
+                    (str(game_id), str(player), str(stats['team']), int(stats['points']), int(stats['two_pt']), int(stats['three_pt']), int(stats['free_throws']), 
+                    int(stats['turnovers']), int(stats['rebounds']), int(stats['assists']), int(stats['steals']), int(stats['blocks']))
+                    for player, stats in result['player_stats'].items()
+                ]
             )
-            
-            # insert player stats
-            if 'player_stats' in result:
-                for player, stats in result['player_stats'].items():
-                    cursor.execute(
-                        "INSERT INTO player_stats (game_id, player_name, team, points, two_pt, three_pt, free_throws, turnovers, rebounds, assists, steals, blocks) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
-                        (str(game_id), str(player), str(stats['team']), int(stats['points']), int(stats['two_pt']), int(stats['three_pt']), int(stats['free_throws']), 
-                        int(stats['turnovers']), int(stats['rebounds']), int(stats['assists']), int(stats['steals']), int(stats['blocks']))
-                    )
 
-    except sqlite3.Error as e:
-        logging.error(f"Database error while saving game: {e}")
-        raise
     except Exception as e:
         logging.error(f"An unexpected error occurred while saving game to database: {e}")
         raise
 
 def save_playoffs_game_to_db(game_id, result):
-    """Save playoff game results to database"""
+    """Queue playoff game results for the database writer"""
     try:
-        with sqlite3.connect('nba_simulation.db') as conn:
-            cursor = conn.cursor()
-            
-            conn.execute('BEGIN')
-
-            # Extract series information
-            series = result.get('series', '')
-            game_number = result.get('game_number', 0)
-            
-            # Determine conference and round 
-            conference = result.get('conference', 'NBA Finals')
-            round_name = result.get('round', 'First Round')
+        # Extract series information
+        series = result.get('series', '')
+        game_number = result.get('game_number', 0)
+        
+        # Determine conference and round 
+        conference = result.get('conference', 'NBA Finals')
+        round_name = result.get('round', 'First Round')
 
-            logging.info(f"Saving playoff game: {game_id}, Series: {series}, Round: {round_name}")
-            
-            # Insert playoff game result
-            cursor.execute(
-                "INSERT OR REPLACE INTO playoffs_games VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
-                (
-                    str(game_id), 
-                    str(result['team1']), 
-                    str(result['team2']), 
-                    int(result['score1']), 
-                    int(result['score2']), 
-                    str(result['winner']),
-                    str(result.get('arena', 'Unknown Arena')), 
-                    str(result.get('date', datetime.now().strftime('%Y-%m-%d'))),
-                    str(series),
-                    int(game_number),
-                    str(conference),
-                    str(round_name)
-                )
+        logging.info(f"Saving playoff game: {game_id}, Series: {series}, Round: {round_name}")
+        
+        # Insert playoff game result
+        _queue_write(
+            INSERT_PLAYOFFS_GAME_SQL,
+            [(
+                str(game_id), 
+                str(result['team1']), 
+                str(result['team2']), 
+                int(result['score1']), 
+                int(result['score2']), 
+                str(result['winner']),
+                str(result.get('arena', 'Unknown Arena')), 
+                str(result.get('date', TODAY)),
+                str(series),
+                int(game_number),
+                str(conference),
+                str(round_name)
+            )]
+        )
+        
+        # Insert player stats in one batch
+        if 'player_stats' in result:
+            _queue_write(
+                INSERT_PLAYOFFS_PLAYER_STATS_SQL,
+                [
+                    (str(game_id), str(player), str(stats['team']), int(stats['points']), int(stats['two_pt']), int(stats['three_pt']), int(stats['free_throws']), 
+                    int(stats['turnovers']), int(stats['rebounds']), int(stats['assists']), int(stats['steals']), int(stats['blocks']))
+                    for player, stats in result['player_stats'].items()
+                ]
             )
-            
-            # Insert player stats
-            if 'player_stats' in result:
-                for player, stats in result['player_stats'].items():
-                    cursor.execute(
-                        "INSERT INTO playoffs_player_stats (game_id, player_name, team, points, two_pt, three_pt, free_throws, turnovers, rebounds, assists, steals, blocks) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
-                        (str(game_id), str(player), str(stats['team']), int(stats['points']), int(stats['two_pt']), int(stats['three_pt']), int(stats['free_throws']), 
-                        int(stats['turnovers']), int(stats['rebounds']), int(stats['assists']), int(stats['steals']), int(stats['blocks']))
-                    )
-
-            conn.commit()
 
-    except sqlite3.Error as e:
-        logging.error(f"Database error while saving playoff game: {e}")
-        raise
     except Exception as e:
         logging.error(f"An unexpected error occurred while saving playoff game to database: {e}")
         raise
@@ -209,7 +359,8 @@ def save_playoffs_game_to_db(game_id, result):
 def save_playoff_series_to_db(series_name, team1, team2, team1_wins, team2_wins, winner, conference, round_name):
     """Save playoff series results to database"""
     try:
-        with sqlite3.connect('nba_simulation.db') as conn:
+        conn = get_conn()
+        with conn:
             cursor = conn.cursor()
             
             # Check if series already exists
@@ -231,32 +382,56 @@ def save_playoff_series_to_db(series_name, team1, team2, team1_wins, team2_wins,
                     (series_name, team1, team2, team1_wins, team2_wins, winner, conference, round_name)
                 )
             
-            conn.commit()
-            logging.info(f"Series result saved: {series_name} - {winner} wins {team1_wins}-{team2_wins}")
+        # The with block commits on exit, so the series is saved by the time this is logged
+        logging.info(f"Series result saved: {series_name} - {winner} wins {team1_wins}-{team2_wins}")
 
     except sqlite3.Error as e:
         logging.error(f"Database error while saving playoff series: {e}")
     except Exception as e:
         logging.error(f"An unexpected error occurred while saving playoff series to database: {e}")
 
-def save_stadium_ops_to_db(game_id, arena, operation_type, processed_count, details=None):
-    """Save stadium operations data to database"""
+def get_last_game_id():
+    """Get the highest integer regular season game id already saved, or 0 if there are none"""
     try:
-        with sqlite3.connect('nba_simulation.db') as conn: 
-            cursor = conn.cursor()
-            
-            cursor.execute(
-                "INSERT INTO stadium_ops (game_id, arena, operation_type, processed_count, details) VALUES (?, ?, ?, ?, ?)",
-                (game_id, arena, operation_type, processed_count, details or "")
-            )
+        conn = get_conn()
+        # Ids from earlier runs may be uuid strings, so only count the all-digit ones
+        row = conn.execute(
+            "SELECT MAX(CAST(id AS INTEGER)) FROM games WHERE id NOT GLOB '*[^0-9]*'"
+        ).fetchone()
+        return row[0] or 0
 
     except sqlite3.Error as e:
-        logging.error(f"Database error while saving stadium operations: {e}")
+        logging.error(f"Database error while reading the last game id: {e}")
         raise
+
+def save_stadium_ops_to_db(operations):
+    """Queue a batch of stadium operations rows (game_id, arena, operation_type, processed_count, details) for the database writer"""
+    try:
+        _queue_write(
+            INSERT_STADIUM_OPS_SQL,
+            [
+                (game_id, arena, operation_type, processed_count, details or "")
+                for game_id, arena, operation_type, processed_count, details in operations
+            ]
+        )
+
     except Exception as e:
         logging.error(f"An unexpected error occurred while saving stadium operations to database: {e}")
         raise
 
+def create_report_indexes():
+    """Index the columns the stats report groups by, built after the bulk inserts rather than maintained during them"""
+    try:
+        conn = get_conn()
+        with conn:
+            # Each index also holds the summed/averaged column, so the report never reads the tables themselves
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_games_team1 ON games(team1, score1)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_ps_player ON player_stats(player_name, points)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_ops_type ON stadium_ops(operation_type, processed_count)")
+
+    except sqlite3.Error as e:
+        logging.error(f"Database error while creating report indexes: {e}")
+
 def generate_stats_report():
     """Generate a report of game stats from the database"""
     try:
@@ -282,7 +457,8 @@ def generate_stats_report():
         report_messages = []
         report_messages.append("\n===== NBA SIMULATION STATS REPORT =====")
         
-        with sqlite3.connect('nba_simulation.db') as conn:
+        conn = get_conn()
+        with conn:
             cursor = conn.cursor()
             
             # Get top scoring teams
@@ -293,10 +469,9 @@ def generate_stats_report():
             ORDER BY points DESC
             LIMIT 5
             ''')
-            top_teams = cursor.fetchall()
             
             report_messages.append("\nTOP SCORING TEAMS:")
-            for i, (team, points) in enumerate(top_teams, 1):
+            for i, (team, points) in enumerate(cursor, 1):
                 report_messages.append(f"{i}. {team}: {points} points")
             
             # Get top scoring players
@@ -307,10 +482,9 @@ def generate_stats_report():
             ORDER BY total_points DESC
             LIMIT 10
             ''')
-            top_players = cursor.fetchall()
             
             report_messages.append("\nTOP SCORING PLAYERS:")
-            for i, (player, points) in enumerate(top_players, 1):
+            for i, (player, points) in enumerate(cursor, 1):
                 report_messages.append(f"{i}. {player}: {points} points")
             
             # Get stadium operation stats
@@ -319,17 +493,15 @@ def generate_stats_report():
             FROM stadium_ops
             GROUP BY operation_type
             ''')
-            ops_stats = cursor.fetchall()
             
             report_messages.append("\nSTADIUM OPERATIONS AVERAGES:")
-            for op_type, avg in ops_stats:
+            for op_type, avg in cursor:
                 report_messages.append(f"{op_type.capitalize()}: {avg:.1f} average processed")
             
             report_messages.append("\n======================================")
         
-        # Log all messages to both the main log and the file
-        for message in report_messages:
-            logging.info(message)
+        # Log the whole report as one record to both the main log and the file
+        logging.info("\n".join(report_messages))
         
         # Remove the file handler after logging
         root_logger.removeHandler(file_handler)
@@ -365,7 +537,8 @@ def generate_playoffs_report():
         report_messages = []
         report_messages.append("\n===== 🏆 NBA PLAYOFFS REPORT 🏆 =====")
         
-        with sqlite3.connect('nba_simulation.db') as conn:
+        conn = get_conn()
+        with conn:
             cursor = conn.cursor()
             
             # Get all playoff series
@@ -388,15 +561,11 @@ def generate_playoffs_report():
                 END
             ''')
             
-            series = cursor.fetchall()
-            
-            # Get champion info if available
-            cursor.execute('''
+            # Get champion info if available, on its own cursor so the series rows can stream below
+            champion = conn.execute('''
             SELECT winner FROM playoffs_series 
             WHERE round = 'Finals' AND winner IS NOT NULL
-            ''')
-            
-            champion = cursor.fetchone()
+            ''').fetchone()
             
             if champion:
                 report_messages.append(f"\nNBA CHAMPION: {champion[0]}")
@@ -405,64 +574,42 @@ def generate_playoffs_report():
             
             conference_series = {}  
             
-            # First, group by round and conference
-            for s_name, t1, t2, t1_wins, t2_wins, winner, conf, round_name in series:
-                # Initialize nested dictionaries as needed
-                if round_name not in conference_series:
-                    conference_series[round_name] = {}
-                
-                if conf not in conference_series[round_name]:
-                    conference_series[round_name][conf] = []
+            # First, group each series' report line by round and conference
+            for s_name, t1, t2, t1_wins, t2_wins, winner, conf, round_name in cursor:
+                status = f"{t1_wins}-{t2_wins}"
+                if winner:
+                    status += f" ({winner} wins)"
+                else:
+                    status += " (In progress)"
                 
-                # Add this series to the appropriate group
-                series_info = {
-                    "team1": t1,
-                    "team2": t2,
-                    "score": f"{t1_wins}-{t2_wins}",
-                    "winner": winner
-                }
-                conference_series[round_name][conf].append(series_info)
+                conference_series.setdefault(round_name, {}).setdefault(conf, []).append(f"    {t1} vs {t2}: {status}")
             
-            # Now output in the correct order
+            # Now output in the correct order; conference names are matched on their first word
             round_order = ['First Round', 'Conference Semifinals', 'Conference Finals', 'NBA Finals']
-            conf_order = ['Eastern Conference', 'Western Conference', 'NBA Finals']
+            conf_order = [('Eastern Conference', 'Eastern'), ('Western Conference', 'Western'), ('NBA Finals', 'NBA')]
             
             for round_name in round_order:
-                if round_name in conference_series:
-                    report_messages.append(f"\n{round_name}:")
+                round_series = conference_series.get(round_name)
+                if not round_series:
+                    continue
+                
+                report_messages.append(f"\n{round_name}:")
+                
+                # Process conferences in order
+                for conf, prefix in conf_order:
+                    # For NBA Finals, the conf might be "NBA Finals" 
+                    if conf == "NBA Finals" and "NBA Finals" not in round_series:
+                        continue
+                    
+                    # Use the first matching conference name, skipping conferences not in this round
+                    conf_key = next((c for c in round_series if c.startswith(prefix)), None)
+                    if conf_key is None:
+                        continue
+                    
+                    report_messages.append(f"\n  {conf_key}:")
                     
-                    # Process conferences in order
-                    for conf in conf_order:
-                        # For NBA Finals, the conf might be "NBA Finals" 
-                        if conf == "NBA Finals" and "NBA Finals" not in conference_series[round_name]:
-                            continue
-                            
-                        # Skip if this conf isn't in this round
-                        full_conf_names = [c for c in conference_series[round_name].keys() 
-                                         if c.startswith(conf.split()[0])]
-                        
-                        if not full_conf_names:
-                            continue
-                            
-                        # Use the first matching conference name
-                        conf_key = full_conf_names[0]
-                        
-                        report_messages.append(f"\n  {conf_key}:")
-                        
-                        # Output all series for this conference in this round
-                        for series_info in conference_series[round_name][conf_key]:
-                            t1 = series_info["team1"]
-                            t2 = series_info["team2"]
-                            score = series_info["score"]
-                            winner = series_info["winner"]
-                            
-                            status = score
-                            if winner:
-                                status += f" ({winner} wins)"
-                            else:
-                                status += " (In progress)"
-                                
-                            report_messages.append(f"    {t1} vs {t2}: {status}")
+                    # Output all series for this conference in this round
+                    report_messages.extend(round_series[conf_key])
             
             # Get top playoff scorers
             cursor.execute('''
@@ -472,10 +619,9 @@ def generate_playoffs_report():
             ORDER BY total_points DESC
             LIMIT 10
             ''')
-            top_scorers = cursor.fetchall()
             
             report_messages.append("\nPLAYOFF TOP SCORERS:")
-            for i, (player, points) in enumerate(top_scorers, 1):
+            for i, (player, points) in enumerate(cursor, 1):
                 report_messages.append(f"{i}. {player}: {points} points")
             
             # Get high-scoring playoff games
@@ -485,18 +631,16 @@ def generate_playoffs_report():
             ORDER BY (score1 + score2) DESC
             LIMIT 5
             ''')
-            high_scoring_games = cursor.fetchall()
             
             report_messages.append("\nHIGHEST SCORING PLAYOFF GAMES:")
-            for i, (team1, team2, score1, score2, winner, date) in enumerate(high_scoring_games, 1):
+            for i, (team1, team2, score1, score2, winner, date) in enumerate(cursor, 1):
                 total_score = score1 + score2
                 report_messages.append(f"{i}. {team1} {score1} - {team2} {score2} ({total_score} pts total), Winner: {winner}")
             
             report_messages.append("\n===================================")
             
-        # Log all messages to both the main log and the file
-        for message in report_messages:
-            logging.info(message)
+        # Log the whole report as one record to both the main log and the file
+        logging.info("\n".join(report_messages))
         
         # Remove the file handler
         root_logger.removeHandler(file_handler)
@@ -2,10 +2,24 @@ import threading
 import queue 
 import json
 
-# Thread-safe data structures
-game_results = {}
-playoff_results = {}
-game_lock = threading.Lock()
+class SimulationContext():
+    """Shared results of one simulation run, passed explicitly to every worker"""
+    def __init__(self, realtime=False):
+        # Pace games and stadium operations with real sleeps when set
+        self.realtime = realtime
+        self.game_results = {}
+        self.playoff_results = {}
+        self.lock = threading.Lock()
+
+    def __getstate__(self):
+        # Locks can't be pickled, so worker processes get a fresh one
+        state = self.__dict__.copy()
+        del state['lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
 
 # Load the JSON file
 with open('data/nba_data.json', 'r') as f:
@@ -14,3 +28,10 @@ with open('data/nba_data.json', 'r') as f:
 # Access the data
 NBA_TEAMS = nba_data['NBA_TEAMS']
 NBA_PLAYERS = nba_data['NBA_PLAYERS']
+
+# Team id lookup by team name, built once instead of scanning NBA_TEAMS per game
+TEAM_IDS = {team_info['name']: team_id for team_id, team_info in NBA_TEAMS.items()}
+
+# Conference membership; the first 15 teams in the data file are the Eastern Conference
+EASTERN_TEAMS = frozenset(team_info['name'] for team_info in list(NBA_TEAMS.values())[:15])
+WESTERN_TEAMS = frozenset(team_info['name'] for team_info in NBA_TEAMS.values()) - EASTERN_TEAMS
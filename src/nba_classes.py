@@ -2,97 +2,114 @@ import random
 import time
 import threading
 import logging
-import datetime
 import json
+import functools
+import itertools
 
-from src.globals import game_lock, game_results, playoff_results, NBA_PLAYERS
-from src.database import save_game_to_db
+from src.globals import NBA_PLAYERS
+from src.database import save_game_to_db, TODAY
 
 # load player stats from JSON file
 with open('data/player_stats.json', 'r') as f:
     player_stats = json.load(f)
 
+# in case there's an error getting the player stats
+DEFAULT_SHOOTING = {"2p%": 0.45, "3p%": 0.35, "ft%": 0.75}
+
+@functools.lru_cache(maxsize=None)
 def get_team_roster(team_id):
-    """Get player roster for a team"""
+    """Get player roster for a team (cached, so returned as an immutable tuple)"""
     if team_id and team_id in NBA_PLAYERS:
-        return NBA_PLAYERS[team_id]
+        return tuple(NBA_PLAYERS[team_id])
     
     # Return a default roster if team not found
-    return [f"Player{i}" for i in range(1, 16)]
+    return tuple(f"Player{i}" for i in range(1, 16))
 
-class Player:
-    def __init__(self, name, team):
-        self.name = name
-        self.team = team
-        self.stats = {
-            'points': 0,
-            'two_pt': 0,
-            'three_pt': 0,
-            'free_throws': 0,
-            'turnovers': 0,
-            'rebounds': 0,
-            'assists': 0,
-            'steals': 0,
-            'blocks': 0
-        }
-    
-    def update_stat(self, stat_name, value=1):
-        """Update a player statistic"""
-        self.stats[stat_name] += value
-    
-    def get_stats_dict(self):
-        """Return stats as a dictionary with team included"""
-        result = self.stats.copy()
-        result['team'] = self.team
-        return result
-    
+# Possession outcomes; home teams turn the ball over less than away teams
+PLAY_TYPES = ('2PT', '3PT', 'FT', 'TO', 'STEAL', 'BLOCK')
+HOME_PLAY_CUM_WEIGHTS = tuple(itertools.accumulate((0.46, 0.26, 0.10, 0.08, 0.05, 0.05)))
+AWAY_PLAY_CUM_WEIGHTS = tuple(itertools.accumulate((0.44, 0.24, 0.10, 0.12, 0.05, 0.05)))
+
+# Per-player stat columns, indexed by these constants
+STAT_NAMES = ('points', 'two_pt', 'three_pt', 'free_throws', 'turnovers', 'rebounds', 'assists', 'steals', 'blocks')
+POINTS, TWO_PT, THREE_PT, FREE_THROWS, TURNOVERS, REBOUNDS, ASSISTS, STEALS, BLOCKS = range(len(STAT_NAMES))
 
 class NBA_Game():
-    def __init__(self, team1, team2, game_id, arena=None, date=None, team1_id=None, team2_id=None):
+    __slots__ = (
+        'game_id', 'context', 'team1', 'team2', 'team1_id', 'team2_id', 'arena', 'date', 'name',
+        'rng', 'realtime', 'score', 'quarters_completed', 'events', 'game_ended',
+        'player_names', 'player_teams', 'two_pt_pct', 'three_pt_pct', 'ft_pct', 'player_stats', 'team_players'
+    )
+
+    def __init__(self, team1, team2, game_id, context, arena=None, date=None, team1_id=None, team2_id=None, rng=None, realtime=False):
         self.game_id = game_id
+        self.context = context
         self.team1 = team1
         self.team2 = team2
         self.team1_id = team1_id
         self.team2_id = team2_id
         self.arena = arena or f"{team1} Arena"
-        self.date = date or datetime.datetime.now().strftime('%Y-%m-%d')
+        self.date = date or TODAY
         self.name = f"Game-{team1}-vs-{team2}"
+        self.rng = rng or random.Random()
+        # Only pace the game with sleeps when watching it play out live
+        self.realtime = realtime
         
-        self.score = {team1: 0, team2: 0}
+        # Scores indexed by side: 0 for team1 (home), 1 for team2 (away)
+        self.score = [0, 0]
         self.quarters_completed = 0
         self.events = []
-        self.event_lock = threading.Lock()
         self.game_ended = threading.Event()
         
         # Initialize players
-        self.players = {}
         self.initialize_players()
     
     def initialize_players(self):
         """Initialize player rosters for both teams"""
-        # Team 1 players
-        roster1 = get_team_roster(self.team1_id) 
-        for player_name in roster1:
-            self.players[player_name] = Player(player_name, self.team1)
-        
-        # Team 2 players
-        roster2 = get_team_roster(self.team2_id) 
-        for player_name in roster2:
-            self.players[player_name] = Player(player_name, self.team2)
+        # Map each player to their team; a player listed on both rosters plays for team 2
+        player_team = {}
+        for player_name in get_team_roster(self.team1_id):
+            player_team[player_name] = self.team1
+        for player_name in get_team_roster(self.team2_id):
+            player_team[player_name] = self.team2
+
+        # Players are plain indices into these parallel lists
+        self.player_names = list(player_team)
+        self.player_teams = list(player_team.values())
+
+        # Resolve shooting percentages once rather than on every possession
+        shooting = [player_stats.get(name, {}) for name in self.player_names]
+        self.two_pt_pct = [pcts.get('2p%', DEFAULT_SHOOTING['2p%']) for pcts in shooting]
+        self.three_pt_pct = [pcts.get('3p%', DEFAULT_SHOOTING['3p%']) for pcts in shooting]
+        self.ft_pct = [pcts.get('ft%', DEFAULT_SHOOTING['ft%']) for pcts in shooting]
+
+        # One column per stat in STAT_NAMES, one entry per player
+        self.player_stats = [[0] * len(self.player_names) for _ in STAT_NAMES]
+
+        # Per-team rosters so picking a player doesn't filter every player on each possession
+        self.team_players = {
+            team: tuple(i for i, player_team_name in enumerate(self.player_teams) if player_team_name == team)
+            for team in (self.team1, self.team2)
+        }
     
-    def add_event(self, event):
-        with self.event_lock:
-            self.events.append((time.time(), event))
-            logging.info(f"[{self.team1} vs {self.team2}] {event}")
+    def add_event(self, template, *args):
+        """Record a play-by-play event as a %-style template and its arguments"""
+        # Each game only appends from its own thread, so no lock is needed
+        self.events.append((time.monotonic(), template, args))
+        # Play-by-play is debug output, only formatted when --verbose turns it on
+        if logging.root.isEnabledFor(logging.DEBUG):
+            logging.debug("[%s vs %s] %s", self.team1, self.team2, template % args)
     
     def get_random_player(self, team):
-        """Get a random player from a team"""
-        team_players = [p for p in self.players.values() if p.team == team]
-        return random.choice(team_players) if team_players else None
+        """Get the index of a random player from a team"""
+        team_players = self.team_players.get(team)
+        return self.rng.choice(team_players) if team_players else None
 
     def simulate_quarter(self, quarter):
         """Simulate a quarter of basketball"""
-        self.add_event(f"Quarter {quarter} started")
+        self.add_event("Quarter %s started", quarter)
+        names = self.player_names
+        stats = self.player_stats
 
         # home team advantage
         home_shooting_boost = 0.03  # 3 percent better shooting
@@ -103,67 +120,64 @@ class NBA_Game():
         away_team = self.team2
 
         # Simulate possessions for this quarter
-        possessions = random.randint(20, 30)
-        for _ in range(possessions):
-            # home court possesion advantage
-            if random.random() < home_possession_advantage:
+        possessions = self.rng.randint(20, 30)
+
+        # Draw possession and play type for the whole quarter up front, one choices() call per team
+        # home court possesion advantage
+        home_possessions = [self.rng.random() < home_possession_advantage for _ in range(possessions)]
+        home_count = sum(home_possessions)
+        home_plays = iter(self.rng.choices(PLAY_TYPES, cum_weights=HOME_PLAY_CUM_WEIGHTS, k=home_count))
+        away_plays = iter(self.rng.choices(PLAY_TYPES, cum_weights=AWAY_PLAY_CUM_WEIGHTS, k=possessions - home_count))
+
+        # Pick the offensive and defensive player for every possession up front as well
+        home_roster = self.team_players[home_team]
+        away_roster = self.team_players[away_team]
+        if home_roster and away_roster:
+            home_offense = iter(self.rng.choices(home_roster, k=home_count))
+            home_defense = iter(self.rng.choices(away_roster, k=home_count))
+            away_offense = iter(self.rng.choices(away_roster, k=possessions - home_count))
+            away_defense = iter(self.rng.choices(home_roster, k=possessions - home_count))
+        else:
+            # No one to play the quarter with if either roster is empty
+            home_possessions = []
+
+        for is_home_possession in home_possessions:
+            if is_home_possession:
+                offense = 0
                 offense_team = home_team
                 defense_team = away_team
+                play_type = next(home_plays)
+                offense_player = next(home_offense)
+                defense_player = next(home_defense)
             else:
+                offense = 1
                 offense_team = away_team
                 defense_team = home_team
+                play_type = next(away_plays)
+                offense_player = next(away_offense)
+                defense_player = next(away_defense)
             
-            # Get random players for this play
-            offense_player = self.get_random_player(offense_team)
-            defense_player = self.get_random_player(defense_team)
-            
-            if not offense_player or not defense_player:
-                continue
-            
-            if offense_team == home_team:
-                # home team gets fewer turnovers
-                play_weights = [0.46, 0.26, 0.10, 0.08, 0.05, 0.05]  
-            else:
-                # Away team gets more turnovers
-                play_weights = [0.44, 0.24, 0.10, 0.12, 0.05, 0.05]  
-            
-            # Simulate a possession
-            play_type = random.choices(
-                ['2PT', '3PT', 'FT', 'TO', 'STEAL', 'BLOCK'], 
-                weights=play_weights
-            )[0]
-            
-            default_stats = {"2p%": 0.45, "3p%": 0.35, "ft%": 0.75} # in case there's an error getting the player stats 
-
             if play_type == '2PT':
-                try:
-                    base_percentage = player_stats.get(offense_player.name, default_stats)['2p%']
-                    # home court advantage 
-                    if offense_team == home_team:
-                        success_chance = base_percentage + home_shooting_boost
-                    else:
-                        success_chance = base_percentage
-                    success = random.random() < success_chance
-                except KeyError:
-                    #  home court advantage + default percentage
-                    if offense_team == home_team:
-                        success = random.random() < (default_stats['2p%'] + home_shooting_boost)
-                    else:
-                        success = random.random() < default_stats['2p%']
+                # home court advantage 
+                if offense_team == home_team:
+                    success_chance = self.two_pt_pct[offense_player] + home_shooting_boost
+                else:
+                    success_chance = self.two_pt_pct[offense_player]
+                success = self.rng.random() < success_chance
 
                 if success:
-                    self.score[offense_team] += 2
-                    offense_player.update_stat('points', 2)
-                    offense_player.update_stat('two_pt', 1)
+                    self.score[offense] += 2
+                    stats[POINTS][offense_player] += 2
+                    stats[TWO_PT][offense_player] += 1
                     
                     # Possible assist
-                    if random.random() < 0.6:  # 60% of made shots are assisted
+                    if self.rng.random() < 0.6:  # 60% of made shots are assisted
                         assisting_player = self.get_random_player(offense_team)
-                        if assisting_player and assisting_player != offense_player:
-                            assisting_player.update_stat('assists')
-                            self.add_event(f"{offense_player.name} scores 2 points, assisted by {assisting_player.name}")
+                        if assisting_player is not None and assisting_player != offense_player:
+                            stats[ASSISTS][assisting_player] += 1
+                            self.add_event("%s scores 2 points, assisted by %s", names[offense_player], names[assisting_player])
                     else:
-                        self.add_event(f"{offense_player.name} scores 2 points")
+                        self.add_event("%s scores 2 points", names[offense_player])
                 else:
                     # Rebound opportunity with home court advantage
                     rebound_defensive_chance = 0.7  # Base 70 percent defensive rebound chance (based on stats)
@@ -174,99 +188,91 @@ class NBA_Game():
                     else:
                         rebound_defensive_chance -= home_rebound_boost  # Away defense gets rebound penalty
                     
-                    if random.random() < rebound_defensive_chance:
+                    if self.rng.random() < rebound_defensive_chance:
                         rebounder = self.get_random_player(defense_team)
-                        if rebounder:
-                            rebounder.update_stat('rebounds')
-                            self.add_event(f"{offense_player.name} misses a shot, {rebounder.name} rebounds")
+                        if rebounder is not None:
+                            stats[REBOUNDS][rebounder] += 1
+                            self.add_event("%s misses a shot, %s rebounds", names[offense_player], names[rebounder])
                     else:
                         rebounder = self.get_random_player(offense_team)
-                        if rebounder:
-                            rebounder.update_stat('rebounds')
-                            self.add_event(f"{offense_player.name} misses a shot, offensive rebound by {rebounder.name}")
+                        if rebounder is not None:
+                            stats[REBOUNDS][rebounder] += 1
+                            self.add_event("%s misses a shot, offensive rebound by %s", names[offense_player], names[rebounder])
                 
             elif play_type == '3PT':
-                try:
-                    base_percentage = player_stats.get(offense_player.name, default_stats)['3p%']
-                    # home court advantage 
-                    if offense_team == home_team:
-                        success_chance = base_percentage + home_shooting_boost
-                    else:
-                        success_chance = base_percentage
-                    success = random.random() < success_chance
-                except KeyError:
-                    # home court advantage + default percentage
-                    if offense_team == home_team:
-                        success = random.random() < (default_stats['3p%'] + home_shooting_boost)
-                    else:
-                        success = random.random() < default_stats['3p%']
+                # home court advantage 
+                if offense_team == home_team:
+                    success_chance = self.three_pt_pct[offense_player] + home_shooting_boost
+                else:
+                    success_chance = self.three_pt_pct[offense_player]
+                success = self.rng.random() < success_chance
 
                 if success:
-                    self.score[offense_team] += 3
-                    offense_player.update_stat('points', 3)
-                    offense_player.update_stat('three_pt', 1)
+                    self.score[offense] += 3
+                    stats[POINTS][offense_player] += 3
+                    stats[THREE_PT][offense_player] += 1
                     
                     # Possible assist
-                    if random.random() < 0.8:  # 80% of 3PT are assisted
+                    if self.rng.random() < 0.8:  # 80% of 3PT are assisted
                         assisting_player = self.get_random_player(offense_team)
-                        if assisting_player and assisting_player != offense_player:
-                            assisting_player.update_stat('assists')
-                            self.add_event(f"{offense_player.name} scores a three-pointer, assisted by {assisting_player.name}")
+                        if assisting_player is not None and assisting_player != offense_player:
+                            stats[ASSISTS][assisting_player] += 1
+                            self.add_event("%s scores a three-pointer, assisted by %s", names[offense_player], names[assisting_player])
                     else:
-                        self.add_event(f"{offense_player.name} scores a three-pointer!")
+                        self.add_event("%s scores a three-pointer!", names[offense_player])
                 else:
                     # Rebound opportunity
-                    if random.random() < 0.75:  # 75% defensive rebounds on 3PT misses
+                    if self.rng.random() < 0.75:  # 75% defensive rebounds on 3PT misses
                         rebounder = self.get_random_player(defense_team)
-                        if rebounder:
-                            rebounder.update_stat('rebounds')
-                            self.add_event(f"{offense_player.name} misses a three-point attempt, {rebounder.name} rebounds")
+                        if rebounder is not None:
+                            stats[REBOUNDS][rebounder] += 1
+                            self.add_event("%s misses a three-point attempt, %s rebounds", names[offense_player], names[rebounder])
                     else:
                         rebounder = self.get_random_player(offense_team)
-                        if rebounder:
-                            rebounder.update_stat('rebounds')
-                            self.add_event(f"{offense_player.name} misses a three-point attempt, offensive rebound by {rebounder.name}")
+                        if rebounder is not None:
+                            stats[REBOUNDS][rebounder] += 1
+                            self.add_event("%s misses a three-point attempt, offensive rebound by %s", names[offense_player], names[rebounder])
             
             elif play_type == 'FT':
-                shots = random.randint(1, 3)
+                shots = self.rng.randint(1, 3)
                 made = 0
+                # smaller home court advantage for free throws (half the boost)
+                if offense_team == home_team:
+                    ft_success_chance = self.ft_pct[offense_player] + (home_shooting_boost/2) 
+                else:
+                    ft_success_chance = self.ft_pct[offense_player]
+
                 for _ in range(shots):
-                    base_ft_percentage = player_stats.get(offense_player.name, {}).get('ft%', 0.75)
-                    # smaller home court advantage for free throws (half the boost)
-                    if offense_team == home_team:
-                        ft_success_chance = base_ft_percentage + (home_shooting_boost/2) 
-                    else:
-                        ft_success_chance = base_ft_percentage
-                        
-                    if random.random() < ft_success_chance:
+                    if self.rng.random() < ft_success_chance:
                         made += 1
                 
                 if made > 0:
-                    self.score[offense_team] += made
-                    offense_player.update_stat('points', made)
+                    self.score[offense] += made
+                    stats[POINTS][offense_player] += made
                 
-                self.add_event(f"{offense_player.name} makes {made} of {shots} free throws")
+                self.add_event("%s makes %s of %s free throws", names[offense_player], made, shots)
             
             elif play_type == 'TO':
-                offense_player.update_stat('turnovers')
-                self.add_event(f"{offense_player.name} turns the ball over to {defense_team}")
+                stats[TURNOVERS][offense_player] += 1
+                self.add_event("%s turns the ball over to %s", names[offense_player], defense_team)
             
             elif play_type == 'STEAL':
-                defense_player.update_stat('steals')
-                self.add_event(f"{defense_player.name} steals the ball from {offense_player.name}")
+                stats[STEALS][defense_player] += 1
+                self.add_event("%s steals the ball from %s", names[defense_player], names[offense_player])
             
             elif play_type == 'BLOCK':
-                defense_player.update_stat('blocks')
-                self.add_event(f"{defense_player.name} blocks {offense_player.name}'s shot")
+                stats[BLOCKS][defense_player] += 1
+                self.add_event("%s blocks %s's shot", names[defense_player], names[offense_player])
             
             # Short sleep
-            time.sleep(0.05)
+            if self.realtime:
+                time.sleep(0.05)
         
-        self.add_event(f"Quarter {quarter} ended. Score: {self.team1} {self.score[self.team1]} - {self.team2} {self.score[self.team2]}")
+        self.add_event("Quarter %s ended. Score: %s %s - %s %s", quarter, self.team1, self.score[0], self.team2, self.score[1])
         self.quarters_completed += 1
     
     def run(self):
-        self.add_event(f"🏀 Game started at {self.arena}!")
+        self.add_event("🏀 Game started at %s!", self.arena)
         
         # Simulate 4 quarters
         for quarter in range(1, 5):
@@ -275,33 +281,38 @@ class NBA_Game():
             # Short break between quarters
             if quarter < 4:
                 self.add_event("Quarter break")
-                time.sleep(0.5)
+                if self.realtime:
+                    time.sleep(0.5)
         
         # Determine winner
-        if self.score[self.team1] == self.score[self.team2]:
+        if self.score[0] == self.score[1]:
             # Simulate overtime
             self.add_event("Game tied! Going to overtime")
             self.simulate_quarter(5)
         
-        winner = max(self.score, key=self.score.get)
-        self.add_event(f"🏆 Final Score: {self.team1} {self.score[self.team1]} - {self.team2} {self.score[self.team2]}")
-        self.add_event(f"🎉 Winner: {winner}")
+        # team1 keeps a tie, as max() over the old score dict did
+        winner = self.team1 if self.score[0] >= self.score[1] else self.team2
+        self.add_event("🏆 Final Score: %s %s - %s %s", self.team1, self.score[0], self.team2, self.score[1])
+        self.add_event("🎉 Winner: %s", winner)
         
         # Prepare player stats
-        player_stats = {player.name: player.get_stats_dict() for player in self.players.values()}
+        names = self.player_names
+        player_stats = {names[i]: dict(zip(STAT_NAMES, row), team=self.player_teams[i])
+                        for i, row in enumerate(zip(*self.player_stats))}
         
-        # Determine if this is a playoff game by looking at the game_id format
-        is_playoff_game = any(prefix in self.game_id for prefix in ["R1-", "SF-", "CF-", "F-"])
+        # Determine if this is a playoff game by looking at the game_id format;
+        # regular season ids are plain integers
+        is_playoff_game = isinstance(self.game_id, str) and any(prefix in self.game_id for prefix in ["R1-", "SF-", "CF-", "F-"])
         
         # Store game results safely
-        with game_lock:
+        with self.context.lock:
             if is_playoff_game:
                 # Store in playoff_results dict for playoff games
-                playoff_results[self.game_id] = {
+                self.context.playoff_results[self.game_id] = {
                     'team1': self.team1,
                     'team2': self.team2,
-                    'score1': self.score[self.team1],
-                    'score2': self.score[self.team2],
+                    'score1': self.score[0],
+                    'score2': self.score[1],
                     'winner': winner,
                     'events': self.events,
                     'arena': self.arena,
@@ -311,11 +322,11 @@ class NBA_Game():
 
             else:
                 # save to regular season game results dict
-                game_results[self.game_id] = {
+                self.context.game_results[self.game_id] = {
                     'team1': self.team1,
                     'team2': self.team2,
-                    'score1': self.score[self.team1],
-                    'score2': self.score[self.team2],
+                    'score1': self.score[0],
+                    'score2': self.score[1],
                     'winner': winner,
                     'events': self.events,
                     'arena': self.arena,
@@ -323,7 +334,7 @@ class NBA_Game():
                     'player_stats': player_stats
                 }
                 # Save regular season games to database
-                save_game_to_db(self.game_id, game_results[self.game_id])
+                save_game_to_db(self.game_id, self.context.game_results[self.game_id])
         
         # Signal that the game has ended
         self.game_ended.set()
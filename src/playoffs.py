@@ -1,30 +1,30 @@
 import random
 from datetime import datetime, timedelta
 import logging
-import sqlite3
+import heapq
 from concurrent.futures import ThreadPoolExecutor
 
 from src.nba_classes import NBA_Game
-from src.globals import NBA_TEAMS, playoff_results
-from src.database import save_playoffs_game_to_db, save_playoff_series_to_db
-from src.stadium_ops import StadiumOperation
+from src.globals import NBA_TEAMS, TEAM_IDS, EASTERN_TEAMS, WESTERN_TEAMS
+from src.database import get_conn, flush_writes, save_playoffs_game_to_db, save_playoff_series_to_db, save_stadium_ops_to_db
+from src.stadium_ops import StadiumOperation, STADIUM_OPS_PER_GAME
 
 def get_team_standings():
     """Get team standings from the database"""
-    conn = sqlite3.connect('nba_simulation.db')
+    conn = get_conn()
     cursor = conn.cursor()
 
-    # Get all games from the database
-    cursor.execute('SELECT team1, team2, winner FROM games')
-    games = cursor.fetchall()
-    conn.close()
+    # Tally wins and losses per team in SQLite instead of looping over every game
+    cursor.execute('SELECT winner, COUNT(*) FROM games GROUP BY winner')
+    wins = dict(cursor.fetchall())
+
+    cursor.execute('''
+    SELECT CASE WHEN winner = team1 THEN team2 ELSE team1 END AS loser, COUNT(*)
+    FROM games
+    GROUP BY loser
+    ''')
+    losses = dict(cursor.fetchall())
 
-    # split teams by conference
-    eastern_teams = ["Boston Celtics", "Miami Heat", "Milwaukee Bucks", "Philadelphia 76ers", 
-                    "New York Knicks", "Cleveland Cavaliers", "Atlanta Hawks", "Chicago Bulls", 
-                    "Toronto Raptors", "Brooklyn Nets", "Charlotte Hornets", "Indiana Pacers", 
-                    "Orlando Magic", "Detroit Pistons", "Washington Wizards"]
-    
     # Initialize standings
     standings = {}
     for team_info in NBA_TEAMS.values():
@@ -32,47 +32,34 @@ def get_team_standings():
         standings[team_name] = {
             'name': team_name,
             'arena': team_info['arena'],
-            'conference': 'East' if team_name in eastern_teams else 'West',
-            'wins': 0,
-            'losses': 0
+            'conference': 'East' if team_name in EASTERN_TEAMS else 'West',
+            'wins': wins.get(team_name, 0),
+            'losses': losses.get(team_name, 0)
         }
 
-    # Calculate wins and losses
-    for team1, team2, winner in games:
-        if team1 in standings and team2 in standings:
-            if winner == team1:
-                standings[team1]['wins'] += 1
-                standings[team2]['losses'] += 1
-            elif winner == team2:
-                standings[team2]['wins'] += 1
-                standings[team1]['losses'] += 1
-
     return standings
 
-def create_playoff_bracket():
+def win_percentage(team):
+    """Win percentage of a standings entry, 0 for a team that hasn't played"""
+    games_played = team['wins'] + team['losses']
+    return team['wins'] / games_played if games_played > 0 else 0
+
+def create_playoff_bracket(standings):
     """Create playoff brackets based on team standings"""
-    standings = get_team_standings()
-    
     # Split teams by conference
     east_teams = [team for team in standings.values() if team['conference'] == 'East']
     west_teams = [team for team in standings.values() if team['conference'] == 'West']
     
-    # sort the teams by win percentage
-    east_teams.sort(key=lambda x: x['wins']/(x['wins']+x['losses']) if x['wins']+x['losses'] > 0 else 0, reverse=True)
-    west_teams.sort(key=lambda x: x['wins']/(x['wins']+x['losses']) if x['wins']+x['losses'] > 0 else 0, reverse=True)
-    
-    # Take top 8 teams from each conference
-    top_east = east_teams[:8]
-    top_west = west_teams[:8]
+    # Take top 8 teams from each conference by win percentage, without sorting the whole conference
+    top_east = heapq.nlargest(8, east_teams, key=win_percentage)
+    top_west = heapq.nlargest(8, west_teams, key=win_percentage)
     
-    # Log the top 8 of east and west
-    logging.info("Eastern Conference Playoff Teams (1-8):")
-    for i, team in enumerate(top_east):
-        logging.info(f"{i+1}. {team['name']} (wins: {team['wins']} - losses: {team['losses']})")
-        
-    logging.info("Western Conference Playoff Teams (1-8):")
-    for i, team in enumerate(top_west):
-        logging.info(f"{i+1}. {team['name']} (wins: {team['wins']} - losses: {team['losses']})")
+    # Log the top 8 of east and west as a single record
+    lines = ["Eastern Conference Playoff Teams (1-8):"]
+    lines.extend(f"{i}. {team['name']} (wins: {team['wins']} - losses: {team['losses']})" for i, team in enumerate(top_east, 1))
+    lines.append("Western Conference Playoff Teams (1-8):")
+    lines.extend(f"{i}. {team['name']} (wins: {team['wins']} - losses: {team['losses']})" for i, team in enumerate(top_west, 1))
+    logging.info("\n".join(lines))
     
     # Create matchups - 1v8, 2v7, 3v6, 4v5 
     east_matchups = [
@@ -89,21 +76,20 @@ def create_playoff_bracket():
         (top_west[1]['name'], top_west[6]['name'])
     ]
     
-    logging.info("Eastern Conference First Round Matchups:")
-    for i, (team1, team2) in enumerate(east_matchups):
-        logging.info(f"Series {i+1}: {team1} vs {team2}")
-        
-    logging.info("Western Conference First Round Matchups:")
-    for i, (team1, team2) in enumerate(west_matchups):
-        logging.info(f"Series {i+1}: {team1} vs {team2}")
+    lines = ["Eastern Conference First Round Matchups:"]
+    lines.extend(f"Series {i}: {team1} vs {team2}" for i, (team1, team2) in enumerate(east_matchups, 1))
+    lines.append("Western Conference First Round Matchups:")
+    lines.extend(f"Series {i}: {team1} vs {team2}" for i, (team1, team2) in enumerate(west_matchups, 1))
+    logging.info("\n".join(lines))
     
     return {
         'Eastern Conference': east_matchups,
         'Western Conference': west_matchups
     }
 
-def generate_playoff_schedule(playoff_bracket, start_date=datetime(2024, 4, 20)):
+def generate_playoff_schedule(playoff_bracket, start_date=datetime(2024, 4, 20), rng=None):
     """Generate a playoff schedule from the bracket"""
+    rng = rng or random.Random()
     schedule = []
     current_date = start_date
     series_games = 7  # Best of 7 series
@@ -141,8 +127,8 @@ def generate_playoff_schedule(playoff_bracket, start_date=datetime(2024, 4, 20))
         
         for i, (team1, team2) in enumerate(matchups):
             # Find team IDs and arenas
-            team1_info = next(info for info in NBA_TEAMS.values() if info['name'] == team1)
-            team2_info = next(info for info in NBA_TEAMS.values() if info['name'] == team2)
+            team1_info = NBA_TEAMS[TEAM_IDS[team1]]
+            team2_info = NBA_TEAMS[TEAM_IDS[team2]]
             
             # Alternate home court - higher seed gets games 1, 2, 5, 7
             home_games = [0, 1, 4, 6]  # Games 1, 2, 5, 7 at home court
@@ -182,7 +168,7 @@ def generate_playoff_schedule(playoff_bracket, start_date=datetime(2024, 4, 20))
                     3: [2, 3]        # 2-3 days in NBA finals
                 }[round_index]
                 
-                current_date += timedelta(days=random.choice(days_between))
+                current_date += timedelta(days=rng.choice(days_between))
             
             # Add break between series (longer breaks in later rounds)
             series_break = {
@@ -196,44 +182,54 @@ def generate_playoff_schedule(playoff_bracket, start_date=datetime(2024, 4, 20))
 
     return schedule
 
-def simulate_game_with_stadium_ops(game):
+def simulate_game_with_stadium_ops(game, context, stadium_executor, rng=None):
     """Simulate a single game with parallel stadium operations"""
+    rng = rng or random.Random()
+
     # Find team IDs
-    team1_id = next((id for id, info in NBA_TEAMS.items() if info['name'] == game['home']), None)
-    team2_id = next((id for id, info in NBA_TEAMS.items() if info['name'] == game['away']), None)
+    team1_id = TEAM_IDS.get(game['home'])
+    team2_id = TEAM_IDS.get(game['away'])
     
     # Create and run game
     game_instance = NBA_Game(
         game['home'], 
         game['away'], 
         game['game_id'],
+        context,
         arena=game['arena'],
         date=game['date'],
         team1_id=team1_id,
-        team2_id=team2_id
+        team2_id=team2_id,
+        rng=random.Random(rng.getrandbits(64)),
+        realtime=context.realtime
     )
     
     # Create stadium operations
-    security_ops = StadiumOperation(game['game_id'], game['arena'], "security")
-    concessions_ops = StadiumOperation(game['game_id'], game['arena'], "concessions")
-    merchandise_ops = StadiumOperation(game['game_id'], game['arena'], "merchandise")
-    
-    # Run stadium operations in parallel with the game
-    with ThreadPoolExecutor(max_workers=4) as executor:
-        game_future = executor.submit(game_instance.run)
-        security_future = executor.submit(security_ops.run)
-        concessions_future = executor.submit(concessions_ops.run)
-        merchandise_future = executor.submit(merchandise_ops.run)
-        
-        # Wait for all operations to complete
-        game_future.result()
-        security_future.result()
-        concessions_future.result()
-        merchandise_future.result()
+    security_ops = StadiumOperation(game['game_id'], game['arena'], "security", realtime=context.realtime,
+                                    rng=random.Random(rng.getrandbits(64)))
+    concessions_ops = StadiumOperation(game['game_id'], game['arena'], "concessions", realtime=context.realtime,
+                                       rng=random.Random(rng.getrandbits(64)))
+    merchandise_ops = StadiumOperation(game['game_id'], game['arena'], "merchandise", realtime=context.realtime,
+                                       rng=random.Random(rng.getrandbits(64)))
+    
+    # Run stadium operations in parallel with the game, which plays on the series thread
+    security_future = stadium_executor.submit(security_ops.run)
+    concessions_future = stadium_executor.submit(concessions_ops.run)
+    merchandise_future = stadium_executor.submit(merchandise_ops.run)
+    game_instance.run()
+    
+    # Wait for all operations to complete
+    stadium_rows = [security_future.result(), concessions_future.result(), merchandise_future.result()]
+
+    # Save the stadium operations for this game in one batch
+    save_stadium_ops_to_db(stadium_rows)
     
-    # Get game result
-    if game['game_id'] in playoff_results:
-        result = playoff_results[game['game_id']]
+    # Take the game result out of the context once it's saved, so every game's events and
+    # player stats aren't kept around for the rest of the playoffs
+    with context.lock:
+        result = context.playoff_results.pop(game['game_id'], None)
+
+    if result is not None:
         winner = result['winner']
         
         # Add series information to the result for database
@@ -255,8 +251,9 @@ def simulate_game_with_stadium_ops(game):
     
     return None
 
-def simulate_playoff_series(series_schedule):
+def simulate_playoff_series(series_schedule, context, stadium_executor, rng=None):
     """Simulate a playoff series based on the schedule"""
+    rng = rng or random.Random()
     series_results = {}
     
     if not series_schedule:
@@ -283,8 +280,10 @@ def simulate_playoff_series(series_schedule):
             # Sort games by game number
             games.sort(key=lambda x: x['game_num'])
             
-            # Submit the series for simulation
-            series_futures[series_name] = executor.submit(simulate_single_series, games)
+            # Submit the series for simulation with its own generator, derived here so the
+            # outcome doesn't depend on how the series threads interleave
+            series_futures[series_name] = executor.submit(simulate_single_series, games, context, stadium_executor,
+                                                          random.Random(rng.getrandbits(64)))
         
         # Collect results
         for series_name, future in series_futures.items():
@@ -292,51 +291,46 @@ def simulate_playoff_series(series_schedule):
     
     return series_results
 
-def simulate_single_series(games):
+def simulate_single_series(games, context, stadium_executor, rng=None):
     """Simulate a single playoff series sequentially"""
+    rng = rng or random.Random()
+
     # Extract teams
     team1 = games[0]['home']
     team2 = games[0]['away']
     
     # Get series name for logging
     series_name = games[0]['series']
-    logging.info(f"Starting series: {series_name} - {team1} vs {team2}")
+    logging.info("Starting series: %s - %s vs %s", series_name, team1, team2)
     
     # Track wins
     wins = {team1: 0, team2: 0}
     played_games = []
     
-    # Simulate games until one team reaches 4 wins
-    for game in games:
-        if max(wins.values()) < 4:  # Series not decided yet
-            logging.info(f"Simulating {game['game_id']}: {game['home']} vs {game['away']} at {game['arena']}")
-            
-            # Simulate this game
-            game_result = simulate_game_with_stadium_ops(game)
-            
-            if game_result:
-                winner = game_result['winner']
-                wins[winner] += 1
-                played_games.append(game_result)
-                logging.info(f"Game {game['game_num']} result: {winner} wins ({game_result['score']}). Series: {wins[team1]}-{wins[team2]}")
-            
-            # Mark remaining games as must-win if applicable
-            if wins[team1] == 3:
-                for g in games:
-                    if g['game_num'] > game['game_num']:
-                        g['must_win'] = True
-            elif wins[team2] == 3:
-                for g in games:
-                    if g['game_num'] > game['game_num']:
-                        g['must_win'] = True
-        else:
-            # Series already decided, skip remaining games
-            logging.info(f"Skipping {game['game_id']} as series is already decided")
-            continue
+    # Simulate games until one team reaches 4 wins; games past the clincher are never played
+    for i, game in enumerate(games):
+        logging.info("Simulating %s: %s vs %s at %s", game['game_id'], game['home'], game['away'], game['arena'])
+        
+        # Simulate this game
+        game_result = simulate_game_with_stadium_ops(game, context, stadium_executor, rng)
+        
+        if game_result:
+            winner = game_result['winner']
+            wins[winner] += 1
+            played_games.append(game_result)
+            logging.info("Game %s result: %s wins (%s). Series: %s-%s", game['game_num'], winner, game_result['score'], wins[team1], wins[team2])
+        
+        if max(wins.values()) >= 4:
+            break
+        
+        # Mark remaining games as must-win if applicable
+        if max(wins.values()) == 3:
+            for g in games[i + 1:]:
+                g['must_win'] = True
     
     # Determine series winner
     series_winner = team1 if wins[team1] > wins[team2] else team2
-    logging.info(f"Series completed: {series_name} - {series_winner} wins {wins[team1]}-{wins[team2]}")
+    logging.info("Series completed: %s - %s wins %s-%s", series_name, series_winner, wins[team1], wins[team2])
 
     # Save series results to database
     save_playoff_series_to_db(
@@ -356,193 +350,123 @@ def simulate_single_series(games):
         'games': played_games
     }
 
-def simulate_playoffs(start_date=datetime(2024, 4, 20)):
-    """Simulate the entire NBA playoffs"""
-    
-    # Create playoff bracket
-    bracket = create_playoff_bracket()
-    
-    # Generate first round schedule
-    first_round_schedule = generate_playoff_schedule(bracket, start_date)
-    
-    # Simulate first round
-    logging.info("Simulating First Round")
-    first_round_results = simulate_playoff_series(first_round_schedule)
-    
-    # Log results
-    for series_name, result in first_round_results.items():
-        logging.info(f"{series_name}: {result['winner']} wins {result['score']}")
-    
-    # Create a map to track which teams have advanced
+def log_series_results(series_results):
+    """Log every series result of a round as one record"""
+    # Skip building the lines at all when INFO is filtered out
+    if not logging.getLogger().isEnabledFor(logging.INFO):
+        return
+    logging.info("\n".join(f"{series_name}: {result['winner']} wins {result['score']}"
+                           for series_name, result in series_results.items()))
+
+def split_winners_by_conference(series_results):
+    """Split a round's series winners into Eastern and Western lists, in series order"""
     # ensure that there's no duplicate winners for the advanced teams
     advanced_teams = set()
-    
-    # Extract winners from first round by conference and matchup
     east_winners = []
     west_winners = []
     
-    # Get all teams by conference for verification
-    east_teams = set(team['name'] for team in get_team_standings().values() if team['conference'] == 'East')
-    west_teams = set(team['name'] for team in get_team_standings().values() if team['conference'] == 'West')
-    
-    # Group first round results by conference and ensure uniqueness
-    for series_name, result in first_round_results.items():
+    for series_name, result in series_results.items():
         winner = result['winner']
         
         # Skip if this team has already been counted as a winner
         if winner in advanced_teams:
-            logging.warning(f"Team {winner} appears to have won multiple series! Skipping duplicate.")
+            logging.warning("Team %s appears to have won multiple series! Skipping duplicate.", winner)
             continue
         
         # Add to appropriate conference winners list
-        if winner in east_teams:
+        if winner in EASTERN_TEAMS:
             east_winners.append(winner)
             advanced_teams.add(winner)
-        elif winner in west_teams:
+        elif winner in WESTERN_TEAMS:
             west_winners.append(winner)
             advanced_teams.add(winner)
         else:
-            logging.error(f"Winner {winner} not found in either conference!")
-    
-    logging.info(f"East winners: {east_winners}")
-    logging.info(f"West winners: {west_winners}")
+            logging.error("Winner %s not found in either conference!", winner)
     
-    # ensure we have exactly 4 winners per conference
-    if len(east_winners) != 4:
-        logging.error(f"Incorrect number of Eastern Conference winners: {len(east_winners)}")
-        east_winners = ["Boston Celtics", "Milwaukee Bucks", "Philadelphia 76ers", "Cleveland Cavaliers"]
-    
-    if len(west_winners) != 4:
-        logging.error(f"Incorrect number of Western Conference winners: {len(west_winners)}")
-        west_winners = ["Los Angeles Lakers", "Golden State Warriors", "Dallas Mavericks", "Houston Rockets"]
+    return east_winners, west_winners
 
-    # Second round 
-    # Create conference semifinal matchups 
-    conf_semifinals = {
-        'Eastern Conference Semifinals': [
-            (east_winners[0], east_winners[3]), 
-            (east_winners[1], east_winners[2])
-        ],
-        'Western Conference Semifinals': [
-            (west_winners[0], west_winners[3]), 
-            (west_winners[1], west_winners[2])
-        ]
-    }
-    
-    logging.info("Conference Semifinals Matchups:")
-    for conf, matchups in conf_semifinals.items():
-        for i, (team1, team2) in enumerate(matchups):
-            logging.info(f"{conf} Series {i+1}: {team1} vs {team2}")
-    
-    # Generate second round schedule
-    second_round_start = start_date + timedelta(days=16)  # ~2 weeks after playoffs start
-    second_round_schedule = generate_playoff_schedule(conf_semifinals, second_round_start)
-    
-    # Simulate second round
-    logging.info("Simulating Conference Semifinals")
-    semifinals_results = simulate_playoff_series(second_round_schedule)
-    
-    # Log results and reset tracking
-    advanced_teams.clear()
-    east_semifinal_winners = []
-    west_semifinal_winners = []
+# Conference rounds in order: round name, the round it feeds and that round's bracket label
+# (None for the NBA Finals), days from this round's start to the next, and the (east, west)
+# winners to fall back on if a round doesn't produce the expected number
+CONFERENCE_ROUNDS = [
+    ("First Round", "Conference Semifinals", "Semifinals", 16,
+     ["Boston Celtics", "Milwaukee Bucks", "Philadelphia 76ers", "Cleveland Cavaliers"],
+     ["Los Angeles Lakers", "Golden State Warriors", "Dallas Mavericks", "Houston Rockets"]),
+    ("Conference Semifinals", "Conference Finals", "Finals", 14,
+     ["Boston Celtics", "Milwaukee Bucks"],
+     ["Los Angeles Lakers", "Denver Nuggets"]),
+    ("Conference Finals", "NBA Finals", None, 10,
+     ["Boston Celtics"],
+     ["Los Angeles Lakers"]),
+]
+
+def simulate_playoffs(context, start_date=datetime(2024, 4, 20), seed=None):
+    """Simulate the entire NBA playoffs"""
+    # One seeded generator drives the schedule and every series, so a seeded run is reproducible
+    rng = random.Random(seed)
     
-    for series_name, result in semifinals_results.items():
-        logging.info(f"{series_name}: {result['winner']} wins {result['score']}")
-        winner = result['winner']
-        
-        # Skip if this team has already been counted as a winner
-        if winner in advanced_teams:
-            logging.warning(f"Team {winner} appears to have won multiple series! Skipping duplicate.")
-            continue
+    # Create playoff bracket
+    standings = get_team_standings()
+    bracket = create_playoff_bracket(standings)
+    
+    round_start = start_date
+    all_results = {}
+    
+    # Stadium operations share one pool for the whole playoffs, sized so every game in the
+    # first round (the round with the most series running at once) gets all its operations started together
+    first_round_series = sum(len(matchups) for matchups in bracket.values())
+    with ThreadPoolExecutor(max_workers=first_round_series * STADIUM_OPS_PER_GAME,
+                            thread_name_prefix="StadiumOps") as stadium_executor:
+        # Play each conference round, then build the next round's bracket from its winners
+        for round_name, next_round, next_label, days_to_next_round, east_fallback, west_fallback in CONFERENCE_ROUNDS:
+            schedule = generate_playoff_schedule(bracket, round_start, rng)
             
-        # Add to appropriate conference winners list
-        if winner in east_teams:
-            east_semifinal_winners.append(winner)
-            advanced_teams.add(winner)
-        elif winner in west_teams:
-            west_semifinal_winners.append(winner)
-            advanced_teams.add(winner)
-    
-    logging.info(f"East semifinal winners: {east_semifinal_winners}")
-    logging.info(f"West semifinal winners: {west_semifinal_winners}")
-    
-    # Ensure we have exactly 2 winners per conference
-    if len(east_semifinal_winners) != 2:
-        logging.error(f"Incorrect number of Eastern Conference semifinal winners: {len(east_semifinal_winners)}")
-        east_semifinal_winners = ["Boston Celtics", "Milwaukee Bucks"][:2]
+            logging.info("Simulating %s", round_name)
+            round_results = simulate_playoff_series(schedule, context, stadium_executor, rng)
+            log_series_results(round_results)
+            all_results.update(round_results)
+            
+            east_winners, west_winners = split_winners_by_conference(round_results)
+            logging.info("%s winners - East: %s, West: %s", round_name, east_winners, west_winners)
+            
+            # ensure we have the expected number of winners per conference
+            if len(east_winners) != len(east_fallback):
+                logging.error("Incorrect number of Eastern Conference %s winners: %s", round_name, len(east_winners))
+                east_winners = east_fallback
+            if len(west_winners) != len(west_fallback):
+                logging.error("Incorrect number of Western Conference %s winners: %s", round_name, len(west_winners))
+                west_winners = west_fallback
+            
+            round_start += timedelta(days=days_to_next_round)
+            
+            if next_label is None:
+                logging.info("NBA Finals Teams: %s (East) vs %s (West)", east_winners[0], west_winners[0])
+                bracket = {'NBA Finals': [(east_winners[0], west_winners[0])]}
+            else:
+                # First remaining winner plays the last, second plays second-to-last
+                bracket = {
+                    f"{conference} Conference {next_label}": [(winners[i], winners[-1 - i]) for i in range(len(winners) // 2)]
+                    for conference, winners in (("Eastern", east_winners), ("Western", west_winners))
+                }
+                
+                lines = [f"{next_round} Matchups:"]
+                for conf, matchups in bracket.items():
+                    lines.extend(f"{conf} Series {i}: {team1} vs {team2}" for i, (team1, team2) in enumerate(matchups, 1))
+                logging.info("\n".join(lines))
         
-    if len(west_semifinal_winners) != 2:
-        logging.error(f"Incorrect number of Western Conference semifinal winners: {len(west_semifinal_winners)}")
-        west_semifinal_winners = ["Los Angeles Lakers", "Denver Nuggets"][:2]
-    
-    # Third round 
-    # Create conference finals matchups
-    conf_finals = {
-        'Eastern Conference Finals': [(east_semifinal_winners[0], east_semifinal_winners[1])],
-        'Western Conference Finals': [(west_semifinal_winners[0], west_semifinal_winners[1])]
-    }
-    
-    logging.info("Conference Finals Matchups:")
-    for conf, matchups in conf_finals.items():
-        for team1, team2 in matchups:
-            logging.info(f"{conf} Finals: {team1} vs {team2}")
-    
-    # Generate conference finals schedule
-    conf_finals_start = second_round_start + timedelta(days=14)
-    conf_finals_schedule = generate_playoff_schedule(conf_finals, conf_finals_start)
-    
-    # Simulate conference finals
-    logging.info("Simulating Conference Finals")
-    conf_finals_results = simulate_playoff_series(conf_finals_schedule)
-    
-    # Log results
-    for series_name, result in conf_finals_results.items():
-        logging.info(f"{series_name}: {result['winner']} wins {result['score']}")
-    
-    # Get the winners of each conference final
-    east_winner = None
-    west_winner = None
-    
-    for series_name, result in conf_finals_results.items():
-        winner = result['winner']
-        if "Eastern Conference" in series_name:
-            east_winner = winner
-        elif "Western Conference" in series_name:
-            west_winner = winner
-    
-    # Fallback if we don't have proper conference winners
-    if not east_winner:
-        logging.error("Missing Eastern Conference final winner")
-        east_winner = "Boston Celtics"
-    if not west_winner:
-        logging.error("Missing Western Conference final winner")
-        west_winner = "Los Angeles Lakers"
-    
-    logging.info(f"NBA Finals Teams: {east_winner} (East) vs {west_winner} (West)")
-    
-    # final round
-    # Create NBA Finals matchup
-    finals = {
-        'NBA Finals': [(east_winner, west_winner)]
-    }
-    
-    # Generate NBA Finals schedule
-    finals_start = conf_finals_start + timedelta(days=10)
-    finals_schedule = generate_playoff_schedule(finals, finals_start)
-    
-    # Simulate NBA Finals
-    logging.info("Simulating NBA Finals")
-    finals_results = simulate_playoff_series(finals_schedule)
-    
-    # Log results
-    for series_name, result in finals_results.items():
-        logging.info(f"{series_name}: {result['winner']} wins {result['score']}")
+        # final round
+        finals_schedule = generate_playoff_schedule(bracket, round_start, rng)
+        
+        logging.info("Simulating NBA Finals")
+        finals_results = simulate_playoff_series(finals_schedule, context, stadium_executor, rng)
+        log_series_results(finals_results)
+        all_results.update(finals_results)
     
     # Determine champion
     champion = next(result['winner'] for result in finals_results.values())
-    logging.info(f"NBA CHAMPION: {champion}")
+    logging.info("NBA CHAMPION: %s", champion)
+
+    # Make sure every queued playoff game is committed before the report reads them
+    flush_writes()
     
-    # Combine all results
-    all_results = {**first_round_results, **semifinals_results, **conf_finals_results, **finals_results}
-    return all_results
\ No newline at end of file
+    return all_results
@@ -1,33 +1,49 @@
 import logging
-import uuid
+import os
+import itertools
 from datetime import datetime, timedelta
 from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 import random
 
 from src.nba_classes import NBA_Game
-from src.stadium_ops import StadiumOperation
-from src.globals import NBA_TEAMS
+from src.stadium_ops import StadiumOperation, STADIUM_OPS_PER_GAME
+from src.globals import NBA_TEAMS, TEAM_IDS, EASTERN_TEAMS
+from src.database import save_stadium_ops_to_db, flush_writes
 
-def generate_nba_schedule(season_start_date=datetime(2023, 10, 24), num_games=82):
+def generate_nba_schedule(season_start_date=datetime(2023, 10, 24), num_games=82, seed=None, first_game_id=1):
     """ Generate the NBA regular season schedule """
-    teams = list(NBA_TEAMS.values())
-    eastern_teams = teams[:15]
-    western_teams = teams[15:]
+    rng = random.Random(seed)
+
+    # Split teams by conference in a single pass
+    eastern_teams = []
+    western_teams = []
+    for team in NBA_TEAMS.values():
+        if team["name"] in EASTERN_TEAMS:
+            eastern_teams.append(team)
+        else:
+            western_teams.append(team)
+
+    # Both conference schedules draw from one id sequence so their games never share an id
+    game_ids = itertools.count(first_game_id)
 
     def generate_conference_schedule(conference_teams):
         """Generate a schedule for a single conference """
         schedule = []
         game_date = season_start_date
-        team_schedule = {team["name"]: [] for team in conference_teams}
-        arena_schedule = {team["arena"]: [] for team in conference_teams}
+        team_schedule = {team["name"]: set() for team in conference_teams}
+        arena_schedule = {team["arena"]: set() for team in conference_teams}
+        games_per_date = {}
+        max_games_per_date = len(conference_teams) // 4
         total_games = num_games * len(conference_teams) // 2  # Total games for this conference
 
         while len(schedule) < total_games:
+            date_str = game_date.strftime("%Y-%m-%d")
+
             # Find available home teams for the current date
             available_home_teams = [
                 team for team in conference_teams
-                if game_date.strftime("%Y-%m-%d") not in team_schedule[team["name"]]
-                and game_date.strftime("%Y-%m-%d") not in arena_schedule[team["arena"]]
+                if date_str not in team_schedule[team["name"]]
+                and date_str not in arena_schedule[team["arena"]]
             ]
 
             if not available_home_teams:
@@ -35,12 +51,12 @@ def generate_nba_schedule(season_start_date=datetime(2023, 10, 24), num_games=82
                 game_date += timedelta(days=1)
                 continue
 
-            home_team = random.choice(available_home_teams)
+            home_team = rng.choice(available_home_teams)
 
             # Find available away teams (not playing today and not the home team)
             available_away_teams = [
                 team for team in conference_teams
-                if game_date.strftime("%Y-%m-%d") not in team_schedule[team["name"]]
+                if date_str not in team_schedule[team["name"]]
                 and team["name"] != home_team["name"]
             ]
 
@@ -49,11 +65,10 @@ def generate_nba_schedule(season_start_date=datetime(2023, 10, 24), num_games=82
                 game_date += timedelta(days=1)
                 continue
 
-            away_team = random.choice(available_away_teams)
+            away_team = rng.choice(available_away_teams)
 
             # Schedule the game
-            game_id = str(uuid.uuid4())
-            date_str = game_date.strftime("%Y-%m-%d")
+            game_id = next(game_ids)
 
             schedule.append({
                 "game_id": game_id,
@@ -64,12 +79,13 @@ def generate_nba_schedule(season_start_date=datetime(2023, 10, 24), num_games=82
             })
 
             # Update team and arena schedules
-            team_schedule[home_team["name"]].append(date_str)
-            team_schedule[away_team["name"]].append(date_str)
-            arena_schedule[home_team["arena"]].append(date_str)
+            team_schedule[home_team["name"]].add(date_str)
+            team_schedule[away_team["name"]].add(date_str)
+            arena_schedule[home_team["arena"]].add(date_str)
+            games_per_date[date_str] = games_per_date.get(date_str, 0) + 1
 
             # If the maximum number of games for the day is reached, move to the next day
-            if sum(1 for game in schedule if game["date"] == date_str) >= len(conference_teams) // 4:
+            if games_per_date[date_str] >= max_games_per_date:
                 game_date += timedelta(days=1)
 
         return schedule
@@ -81,11 +97,18 @@ def generate_nba_schedule(season_start_date=datetime(2023, 10, 24), num_games=82
     # Return schedules for each conference
     return eastern_schedule, western_schedule
 
-def simulate_parallel_games(game_schedule):
+def simulate_parallel_games(game_schedule, context, seed=None):
     """Simulate multiple NBA games in parallel using thread pool"""
-    with ThreadPoolExecutor(max_workers=len(game_schedule)) as executor:
+    # Seed one generator per process and derive an independent one per game,
+    # so a seeded run is reproducible however the threads interleave
+    rng = random.Random(seed)
+
+    # Bounded pools: games scale with the cores, and the stadium pool fits the operations of every game running at once
+    max_workers = min(len(game_schedule), (os.cpu_count() or 1) * 2)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor, \
+         ThreadPoolExecutor(max_workers=max_workers * STADIUM_OPS_PER_GAME) as stadium_executor:
         all_futures = [] 
-        stadium_ops = [] 
+        stadium_futures = []
 
         for game in game_schedule: # loop through schedule dictionaries.
             game_id = game["game_id"] # access game_id from dictionary.
@@ -94,34 +117,30 @@ def simulate_parallel_games(game_schedule):
             arena = game["arena"]
             game_date = game["date"]
             
-            # Find team IDs based on team names
-            team1_id = None
-            team2_id = None
-            
             # Look up the team IDs using the team names
-            for id, team_info in NBA_TEAMS.items():
-                if team_info["name"] == team1:
-                    team1_id = id
-                if team_info["name"] == team2:
-                    team2_id = id
+            team1_id = TEAM_IDS.get(team1)
+            team2_id = TEAM_IDS.get(team2)
 
             # submit stadium ops
-            security = StadiumOperation(game_id, arena, "security")
-            concessions = StadiumOperation(game_id, arena, "concessions")
-            merchandise = StadiumOperation(game_id, arena, "merchandise")
-
-            stadium_ops.extend([security, concessions, merchandise])
+            security = StadiumOperation(game_id, arena, "security", realtime=context.realtime,
+                                        rng=random.Random(rng.getrandbits(64)))
+            concessions = StadiumOperation(game_id, arena, "concessions", realtime=context.realtime,
+                                           rng=random.Random(rng.getrandbits(64)))
+            merchandise = StadiumOperation(game_id, arena, "merchandise", realtime=context.realtime,
+                                           rng=random.Random(rng.getrandbits(64)))
 
-            security_future = executor.submit(security.run)
-            concessions_future = executor.submit(concessions.run)
-            merchandise_future = executor.submit(merchandise.run)
+            security_future = stadium_executor.submit(security.run)
+            concessions_future = stadium_executor.submit(concessions.run)
+            merchandise_future = stadium_executor.submit(merchandise.run)
 
             # submit game
-            game_instance = NBA_Game(team1, team2, game_id, arena, game_date, team1_id, team2_id)
+            game_instance = NBA_Game(team1, team2, game_id, context, arena, game_date, team1_id, team2_id,
+                                     rng=random.Random(rng.getrandbits(64)), realtime=context.realtime)
             game_future = executor.submit(game_instance.run)
 
             all_futures.append(game_future)
 
+            stadium_futures.extend([security_future, concessions_future, merchandise_future])
             all_futures.extend([security_future, concessions_future, merchandise_future])
 
         # Wait for all games to complete
@@ -131,19 +150,26 @@ def simulate_parallel_games(game_schedule):
                 future.result()  # This will raise any exception that occurred during execution
             except Exception as e:
                 logging.error(f"Error in thread: {e}")
-                
-        # Signal all stadium operations to stop
-        for op in stadium_ops:
-            op.stop_event.set()
 
-def simulate_conferences(east_schedule, west_schedule):
+        # Save every stadium operation for this schedule in one batch
+        save_stadium_ops_to_db([future.result() for future in stadium_futures if future.exception() is None])
+
+    # Commit this process's queued writes before it hands back to the caller
+    flush_writes()
+
+def simulate_conferences(east_schedule, west_schedule, context, seed=None):
     """Simulate eastern and western conference games using multiprocessing"""
+    # Each conference process gets its own seed derived from this one
+    rng = random.Random(seed)
+    east_seed = rng.getrandbits(64)
+    west_seed = rng.getrandbits(64)
+
     with ProcessPoolExecutor(max_workers=2) as executor:
         # Submit each conference's games to separate processes
         logging.info("Submitting Eastern Conference games.")
-        east_future = executor.submit(simulate_parallel_games, east_schedule)
+        east_future = executor.submit(simulate_parallel_games, east_schedule, context, east_seed)
         logging.info("Submitting Western Conference games.")
-        west_future = executor.submit(simulate_parallel_games, west_schedule)
+        west_future = executor.submit(simulate_parallel_games, west_schedule, context, west_seed)
         
         # Wait for both conferences to complete their games
         logging.info("Waiting for Eastern Conference to complete.")
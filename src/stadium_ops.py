@@ -1,24 +1,42 @@
-import threading
 import random
 import time
-import queue
 import logging
+import itertools
 
-from src.database import save_stadium_ops_to_db
+# Fan entry types at security and their share of the crowd
+ENTRY_TYPES = ('VIP', 'Season', 'Regular')
+ENTRY_CUM_WEIGHTS = tuple(itertools.accumulate((0.1, 0.3, 0.6)))
+# Security processing time range in seconds for each entry type
+ENTRY_WAIT_TIMES = {
+    'VIP': (0.005, 0.01),      # Fast VIP lane
+    'Season': (0.01, 0.03),    # Season ticket holders
+    'Regular': (0.02, 0.05),   # Regular tickets
+}
+
+# How many picks draw() takes from the generator at a time
+DRAW_BATCH_SIZE = 256
+
+# Security, concessions and merchandise run alongside every game
+STADIUM_OPS_PER_GAME = 3
 
 class StadiumOperation():
-    def __init__(self, game_id, arena_name, operation_type, capacity=18000):
+    def __init__(self, game_id, arena_name, operation_type, capacity=18000, realtime=False, duration=5, rng=None):
         self.game_id = game_id
         self.arena_name = arena_name
         self.operation_type = operation_type
         self.capacity = capacity
-        self.stop_event = threading.Event()
         self.processed_count = 0
-        self.queue = queue.Queue()
         self.details = {}
         self.name = f"{arena_name}-{operation_type}"
+        # Own generator per operation rather than the shared module-level one
+        self.rng = rng or random.Random()
+        # Operations run on a simulated clock; realtime also sleeps through each step
+        self.realtime = realtime
+        self.duration = duration
+        self.elapsed = 0.0
     
     def run(self):
+        """Run the operation and return its stadium_ops row for saving"""
         logging.info(f"Starting {self.operation_type} at {self.arena_name}")
         
         if self.operation_type == "security":
@@ -28,48 +46,40 @@ class StadiumOperation():
         elif self.operation_type == "merchandise":
             self.run_merchandise()
         
-        # Save operations data to database
+        # Operations data is saved to the database in batches by the caller
         details_str = str(self.details) if self.details else None
-        save_stadium_ops_to_db(
-            self.game_id, self.arena_name, self.operation_type,
-            self.processed_count, details_str
-        )
+        return (self.game_id, self.arena_name, self.operation_type, self.processed_count, details_str)
+    
+    def wait(self, seconds):
+        """Advance the operation clock, sleeping only in realtime mode"""
+        if self.realtime:
+            time.sleep(seconds)
+        self.elapsed += seconds
+    
+    def draw(self, population, cum_weights=None):
+        """Yield random picks from population, drawn from the generator in batches"""
+        while True:
+            yield from self.rng.choices(population, cum_weights=cum_weights, k=DRAW_BATCH_SIZE)
     
     def run_security(self):
         # Simulate fans entering arena through security
-        total_fans = random.randint(int(self.capacity * 0.7), self.capacity)
-        entry_rates = {'VIP': 0.1, 'Season': 0.3, 'Regular': 0.6}
-        
+        total_fans = self.rng.randint(int(self.capacity * 0.7), self.capacity)
         self.details['total_fans'] = total_fans
-        self.details['entry_types'] = {entry_type: 0 for entry_type in entry_rates}
-        
-        # Set a time limit rather than processing all fans
-        end_time = time.time() + 5  # 5 seconds in real time like other operations
+        self.details['entry_types'] = {entry_type: 0 for entry_type in ENTRY_TYPES}
+        entry_types = self.draw(ENTRY_TYPES, ENTRY_CUM_WEIGHTS)
         
-        # Process a limited number of fans within the time frame
-        while not self.stop_event.is_set() and time.time() < end_time and self.processed_count < total_fans:
+        # Process a limited number of fans within the time frame rather than all of them
+        while self.elapsed < self.duration and self.processed_count < total_fans:
             # Determine entry type for current fan
-            entry_type = random.choices(
-                list(entry_rates.keys()),
-                weights=list(entry_rates.values())
-            )[0]
+            entry_type = next(entry_types)
             
             # Different processing times based on entry type
-            if entry_type == 'VIP':
-                time.sleep(random.uniform(0.005, 0.01))  # Fast VIP lane
-            elif entry_type == 'Season':
-                time.sleep(random.uniform(0.01, 0.03))   # Season ticket holders
-            else:
-                time.sleep(random.uniform(0.02, 0.05))   # Regular tickets
+            self.wait(self.rng.uniform(*ENTRY_WAIT_TIMES[entry_type]))
             
             self.processed_count += 1
             
-            # Initialize if the key doesn't exist
-            if 'entry_types' not in self.details:
-                self.details['entry_types'] = {key: 0 for key in entry_rates.keys()}
-            
             # Update entry type count
-            self.details['entry_types'][entry_type] = self.details['entry_types'].get(entry_type, 0) + 1
+            self.details['entry_types'][entry_type] += 1
             
             if self.processed_count % 100 == 0:
                 logging.info(f"Security: {self.processed_count} fans have entered {self.arena_name}")
@@ -98,12 +108,11 @@ class StadiumOperation():
         }
         
         # Generate sales for a period of time (simulated)
-        end_time = time.time() + 5  # 5 seconds in real time
-        
-        while not self.stop_event.is_set() and time.time() < end_time:
+        stand_picks = self.draw(stands)
+        while self.elapsed < self.duration:
             # Process a sale
-            stand = random.choice(stands)
-            quantity = random.randint(1, 3)
+            stand = next(stand_picks)
+            quantity = self.rng.randint(1, 3)
             stand_sales[stand] += quantity
             revenue = prices[stand] * quantity
             stand_revenue[stand] += revenue
@@ -111,15 +120,15 @@ class StadiumOperation():
             self.processed_count += quantity
             
             # Simulate transaction time
-            time.sleep(random.uniform(0.01, 0.08))
+            self.wait(self.rng.uniform(0.01, 0.08))
             
             if self.processed_count % 50 == 0:
                 logging.info(f"Concessions: {self.processed_count} orders processed at {self.arena_name}")
-            
-            # Store details
-            self.details['stand_sales'] = stand_sales
-            self.details['stand_revenue'] = stand_revenue
-            self.details['total_revenue'] = sum(stand_revenue.values())
+        
+        # Store details
+        self.details['stand_sales'] = stand_sales
+        self.details['stand_revenue'] = stand_revenue
+        self.details['total_revenue'] = sum(stand_revenue.values())
             
         logging.info(f"Concessions completed: {self.processed_count} orders processed at {self.arena_name}")
         logging.info(f"Total concessions revenue: ${self.details['total_revenue']:.2f}")
@@ -140,19 +149,18 @@ class StadiumOperation():
         }
         
         # Generate sales for 3 hours (simulated time)
-        end_time = time.time() + 5  # 5 seconds in real time
-        
-        while not self.stop_event.is_set() and time.time() < end_time:
+        product_picks = self.draw(products)
+        while self.elapsed < self.duration:
             # Process a sale
-            product = random.choice(products)
-            quantity = random.randint(1, 2)
+            product = next(product_picks)
+            quantity = self.rng.randint(1, 2)
             sales[product] += quantity
             revenue[product] += prices[product] * quantity
             
             self.processed_count += quantity
             
             # Simulate transaction time
-            time.sleep(random.uniform(0.01, 0.1))
+            self.wait(self.rng.uniform(0.01, 0.1))
             
             if self.processed_count % 20 == 0:
                 logging.info(f"Merchandise: {self.processed_count} items sold at {self.arena_name}")